@@ -19,6 +19,8 @@ class LLMConfig(BaseSettings):
     azure_openai_api_version: str = Field(..., validation_alias="AZURE_OPENAI_API_VERSION")
     azure_openai_endpoint: str = Field(..., validation_alias="AZURE_OPENAI_ENDPOINT")
     azure_openai_deployment_name: str = Field(..., validation_alias="AZURE_OPENAI_DEPLOYMENT_NAME")
+    # Optional cheaper/faster deployment for simple per-file work (falls back to the main deployment)
+    azure_openai_small_deployment_name: Optional[str] = Field(None, validation_alias="AZURE_OPENAI_SMALL_DEPLOYMENT_NAME")
 
     # Azure OpenAI Embedding Configuration
     azure_openai_embed_api_endpoint: str = Field(..., validation_alias="AZURE_OPENAI_EMBED_API_ENDPOINT")
@@ -32,6 +34,7 @@ class LLMConfig(BaseSettings):
 
     # Langchain components
     _langchain_llm: Optional[AzureChatOpenAI] = PrivateAttr(default=None)
+    _langchain_llm_small: Optional[AzureChatOpenAI] = PrivateAttr(default=None)
     _langchain_embedding: Optional[AzureOpenAIEmbeddings] = PrivateAttr(default=None)
     
     # Phi components
@@ -82,13 +85,26 @@ class LLMConfig(BaseSettings):
 
     def init_langchain(self) -> None:
         """Initialize Langchain components with Azure OpenAI"""
+        # Retries are handled by utils.llm_retry; client-side retries would multiply the attempts
         self._langchain_llm = AzureChatOpenAI(
             deployment_name="gpt-4o",
             openai_api_key=self.azure_openai_api_key.get_secret_value(),
             azure_endpoint=self.azure_openai_endpoint,
-            openai_api_version=self.azure_openai_api_version
+            openai_api_version=self.azure_openai_api_version,
+            max_retries=0
         )
 
+        if self.azure_openai_small_deployment_name:
+            self._langchain_llm_small = AzureChatOpenAI(
+                deployment_name=self.azure_openai_small_deployment_name,
+                openai_api_key=self.azure_openai_api_key.get_secret_value(),
+                azure_endpoint=self.azure_openai_endpoint,
+                openai_api_version=self.azure_openai_api_version,
+                max_retries=0
+            )
+        else:
+            self._langchain_llm_small = self._langchain_llm
+
         self._langchain_embedding = AzureOpenAIEmbeddings(
             azure_deployment=self.azure_openai_embed_model,
             openai_api_key=self.azure_openai_embed_api_key.get_secret_value(),
@@ -2,8 +2,9 @@ import os
 import json
 import re
 import asyncio
+import copy
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 # Import your LLM configuration
@@ -11,12 +12,25 @@ from config.llm_config import llm_config
 
 # Import file-specific prompts
 from utils.analysis_prompts import (
-    get_js_prompt,
-    get_html_prompt,
-    get_css_prompt,
-    get_json_prompt,
-    get_default_prompt
+    build_prompt,
+    build_batch_prompt,
+    validate_analysis,
+    max_batch_files,
+    MAX_BATCH_CHARS,
+    MAX_CONTENT_CHARS
 )
+from utils.llm_retry import llm_retry, JSON_REPROMPT_SUFFIX
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Files above either limit, or with routing config, are analyzed by the large model
+LARGE_MODEL_CONTENT_CHARS = 8000
+LARGE_MODEL_DEPENDENCIES = 30
+
+
+def _is_error_result(result: Dict[str, Any]) -> bool:
+    """True for the results _analyze_with_ai returns when a file could not be analyzed"""
+    return "analysis_error" in result or ("error" in result and "raw_response" in result)
 
 class AngularProjectAnalyzer:
     """
@@ -28,12 +42,14 @@ class AngularProjectAnalyzer:
         self.file_extensions = {'.js', '.html', '.css', '.json', '.md','.cshtml'}
         self.analysis_results = {}
         self.llm = llm_config._langchain_llm
+        self.llm_small = llm_config._langchain_llm_small or self.llm
         self.instructions = instructions
         self.patterns = {
             'angular_module': re.compile(r'angular\.module\([\'"]([^\'"]+)[\'"]'),
             'angular_controller': re.compile(r'\.controller\([\'"]([^\'"]+)[\'"]'),
             'angular_service': re.compile(r'\.(?:factory|service|provider)\([\'"]([^\'"]+)[\'"]'),
             'angular_directive': re.compile(r'\.directive\([\'"]([^\'"]+)[\'"]'),
+            'angular_registration': re.compile(r'(?:service|factory|provider|component|directive)\([\'"]([^\'"]+)[\'"]'),
             'require_import': re.compile(r'require\([\'"]([^\'"]+)[\'"]'),
             'import_statement': re.compile(r'import.*?from\s+[\'"]([^\'"]+)[\'"]'),
             'angular_component': re.compile(r'component\([\'"]([^\'"]+)[\'"]'),
@@ -66,14 +82,18 @@ class AngularProjectAnalyzer:
             }
         
         # 3. Analyze dependencies between files
+        providers = self._index_providers(file_info_results)
         for file_path, info in file_info_results.items():
-            dependencies = self._find_dependencies(info['content'], file_path, file_info_results)
+            dependencies = self._find_dependencies(info['content'], file_path, file_info_results, providers)
             info['dependencies'] = dependencies
         
-        # 4. Use LLM to analyze each file
-        for file_path, info in file_info_results.items():
-            migration_analysis = await self._analyze_with_ai(info)
-            info.update(migration_analysis)
+        # 4. Use LLM to analyze the files, several of the same type per request.
+        # Files with the same type and content as an earlier file (e.g. scaffolded copies) are analyzed once
+        unique_files, duplicates = self._split_duplicates(file_info_results.values())
+        for batch in self._plan_batches(unique_files):
+            await self._analyze_batch_with_ai(batch)
+        for duplicate, original in duplicates:
+            self._copy_analysis(original, duplicate)
         
         # 5. Save both versions of results
         self.analysis_results = file_info_results
@@ -86,7 +106,8 @@ class AngularProjectAnalyzer:
         for file_path in self.project_path.glob('**/*'):
             if file_path.is_file() and file_path.suffix in self.file_extensions:
                 # Skip node_modules, dist, and other common build directories
-                if any(part in str(file_path) for part in ['node_modules', 'dist', 'build', '.git']):
+                path_str = str(file_path)
+                if any(part in path_str for part in ['node_modules', 'dist', 'build', '.git']):
                     continue
                 all_files.append(file_path)
                 
@@ -121,7 +142,16 @@ class AngularProjectAnalyzer:
             }
 
 
-    def  _find_dependencies(self, content: str, file_path: str, all_files: Dict[str, Dict]) -> List[str]:
+    def _index_providers(self, all_files: Dict[str, Dict]) -> Dict[str, List[str]]:
+        """Map each registered service/component/directive name to the files that register it"""
+        providers: Dict[str, List[str]] = {}
+        for file_path, info in all_files.items():
+            for name in set(self.patterns['angular_registration'].findall(info.get('content', ''))):
+                providers.setdefault(name, []).append(file_path)
+        return providers
+
+    def  _find_dependencies(self, content: str, file_path: str, all_files: Dict[str, Dict],
+                            providers: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """Find dependencies for a given file"""
         dependencies = set()
         file_type = file_path.split('.')[-1]
@@ -139,17 +169,13 @@ class AngularProjectAnalyzer:
                     dependencies.add(resolved_path)
                     
             # Look for injected dependencies
+            if providers is None:
+                providers = self._index_providers(all_files)
             injections = self._extract_injections(content)
             for injection in injections:
                 # Find files that provide this service/component
-                for other_path, other_info in all_files.items():
-                    if other_path == file_path:
-                        continue
-                    
-                    # Check if the file might contain the service
-                    other_content = other_info.get('content', '')
-                    service_pattern = f"(?:service|factory|provider|component|directive)\\(['\"]({injection})['\"]"
-                    if re.search(service_pattern, other_content):
+                for other_path in providers.get(injection, ()):
+                    if other_path != file_path:
                         dependencies.add(other_path)
         
         # HTML file dependencies
@@ -221,7 +247,7 @@ class AngularProjectAnalyzer:
 
         except json.JSONDecodeError:
             # If parsing fails, try extracting JSON using regex
-            match = re.search(r"\{.*\}", response, re.DOTALL)
+            match = _JSON_OBJECT_RE.search(response)
             if match:
                 try:
                     return json.loads(match.group())
@@ -231,6 +257,140 @@ class AngularProjectAnalyzer:
         # Fallback: Return raw response with an error message
         return {"error": "Failed to parse JSON", "raw_response": response}
     
+    def _pick_model(self, file_info: Dict[str, Any]):
+        """Use the small model for simple files and keep the large one for big or routing-critical files"""
+        content = file_info.get('content', '')
+        if (len(content) > LARGE_MODEL_CONTENT_CHARS
+                or len(file_info.get('dependencies', [])) > LARGE_MODEL_DEPENDENCIES
+                or self.patterns['routing'].search(content)):
+            return self.llm
+        return self.llm_small
+
+    @staticmethod
+    def _merge_analysis(file_info: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Merge an analysis result into the file's info, filling fields the model left out or mistyped"""
+        file_info.update(result)
+        # Failed analyses are kept as errors, not padded into empty but valid-looking ones;
+        # on success, computed fields such as dependencies are kept
+        if not _is_error_result(result):
+            validate_analysis(file_info['file_type'], file_info)
+
+    def _parse_json_object(self, response) -> Dict[str, Any]:
+        """Parse a response that must be a JSON object; anything else is reported like unparseable output"""
+        result = self.parse_json_response(response)
+        if not isinstance(result, dict):
+            return {"error": "Expected a JSON object", "raw_response": response.content}
+        return result
+
+    @llm_retry
+    async def _invoke_llm(self, prompt: Dict[str, str], llm):
+        """Invoke the LLM off the event loop, retrying transient provider errors"""
+        messages = [("system", prompt["system"]), ("human", prompt["user"])]
+        return await asyncio.to_thread(llm.invoke, messages)
+
+    @staticmethod
+    def _split_duplicates(file_infos) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        """
+        Separate files whose type and content repeat an earlier file.
+        The prompt depends only on those and the run's instructions, so one analysis serves them all.
+
+        Returns:
+            The files to analyze, and (duplicate, original) pairs for the files that can reuse an analysis
+        """
+        unique_files: List[Dict[str, Any]] = []
+        duplicates: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        originals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for info in file_infos:
+            # Empty and unreadable files are answered locally, there is nothing to share
+            if 'error' in info or not info['content'].strip():
+                unique_files.append(info)
+                continue
+            original = originals.setdefault((info['file_type'], info['content']), info)
+            if original is info:
+                unique_files.append(info)
+            else:
+                duplicates.append((info, original))
+        return unique_files, duplicates
+
+    @staticmethod
+    def _copy_analysis(original: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+        """Give a duplicate file its original's analysis, keeping its own name, path and dependencies"""
+        for key, value in original.items():
+            if key not in duplicate:
+                duplicate[key] = copy.deepcopy(value)
+
+    def _plan_batches(self, file_infos) -> List[List[Dict[str, Any]]]:
+        """Group files that share a prompt type and model into batches within the batch size limits"""
+        batches: List[List[Dict[str, Any]]] = []
+        open_batches: Dict[tuple, List[Dict[str, Any]]] = {}
+        open_chars: Dict[tuple, int] = {}
+        for info in file_infos:
+            content = info['content']
+            # Empty files are answered locally by _analyze_with_ai
+            if not content.strip():
+                batches.append([info])
+                continue
+
+            key = (info['file_type'], id(self._pick_model(info)))
+            size = min(len(content), MAX_CONTENT_CHARS)
+            batch = open_batches.get(key)
+            # File count is capped so the analyses fit the response, characters so the files fit the request
+            if (batch is None or len(batch) >= max_batch_files(info['file_type'])
+                    or open_chars[key] + size > MAX_BATCH_CHARS):
+                batch = open_batches[key] = []
+                open_chars[key] = 0
+                batches.append(batch)
+            batch.append(info)
+            open_chars[key] += size
+        return batches
+
+    async def _analyze_batch_with_ai(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Analyze several files of one type in a single LLM request and merge the results into them.
+        A batch of one file is analyzed on its own.
+        Files missing from (or malformed in) the response fall back to a per-file request.
+        A response that was cut off, or has no entry keyed by a file path, is retried as two half batches.
+        If the request itself fails, every file in the batch is marked as failed.
+        """
+        if len(batch) == 1:
+            self._merge_analysis(batch[0], await self._analyze_with_ai(batch[0]))
+            return
+
+        prompt = build_batch_prompt(
+            batch[0]['file_type'],
+            [(info['relative_path'], info['content']) for info in batch],
+            self.instructions
+        )
+        try:
+            response = await self._invoke_llm(prompt, self._pick_model(batch[0]))
+        except Exception as e:
+            # The request has already been retried by llm_retry; retrying each file on its own
+            # would multiply the calls against a provider that is failing or rate limiting
+            for info in batch:
+                self._merge_analysis(info, {
+                    "analysis_error": str(e),
+                    "migration_insights": "Unable to analyze due to an error."
+                })
+            return
+
+        results = self.parse_json_response(response)
+        # A response that hit the output-token limit is incomplete, and one that is not keyed by the
+        # file paths (e.g. a single object salvaged from broken output) answers none of the files.
+        # Halving keeps the retry to a few requests, where falling back per file would send one per file
+        if (response.response_metadata.get("finish_reason") == "length"
+                or not isinstance(results, dict)
+                or results.keys().isdisjoint(info['relative_path'] for info in batch)):
+            half = len(batch) // 2
+            await self._analyze_batch_with_ai(batch[:half])
+            await self._analyze_batch_with_ai(batch[half:])
+            return
+
+        for info in batch:
+            result = results.get(info['relative_path'])
+            if not isinstance(result, dict):
+                result = await self._analyze_with_ai(info)
+            self._merge_analysis(info, result)
+
     async def _analyze_with_ai(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send the file to AI for analysis with file-type specific prompts
@@ -240,27 +400,37 @@ class AngularProjectAnalyzer:
             file_type = file_info['file_type']
             content = file_info['content']
             file_name = file_info['file_name']
-            
+
+            # Files that could not be read are reported as such, not as empty
+            if 'error' in file_info:
+                return {
+                    "analysis_error": f"Could not read file: {file_info['error']}",
+                    "migration_insights": "Unable to analyze due to an error."
+                }
+
+            # Empty files have nothing to analyze, skip the LLM round-trip
+            if not content.strip():
+                return {
+                    "migration_complexity": "low",
+                    "complexity_factors": [],
+                    "summary": "Empty file, nothing to migrate."
+                }
+
             # Select the appropriate prompt based on file type
-            if file_type == 'js':
-                prompt = get_js_prompt(file_name, content,self.instructions)
-            elif file_type == 'html':
-                prompt = get_html_prompt(file_name, content,self.instructions)
-            elif file_type == 'css':
-                prompt = get_css_prompt(file_name, content,self.instructions)
-            elif file_type == 'json':
-                prompt = get_json_prompt(file_name, content,self.instructions)
-            else:
-                prompt = get_default_prompt(file_name, content, file_type,self.instructions)
+            prompt = build_prompt(file_type, file_name, content, self.instructions)
             
             # Call the LLM
-            response = await asyncio.to_thread(
-                self.llm.invoke, 
-                prompt
-            )
+            llm = self._pick_model(file_info)
+            response = await self._invoke_llm(prompt, llm)
             
             # Parse the JSON response
-            return self.parse_json_response(response)
+            result = self._parse_json_object(response)
+            if "error" in result and "raw_response" in result:
+                # Give the model one chance to correct malformed output
+                retry_prompt = {**prompt, "user": prompt["user"] + JSON_REPROMPT_SUFFIX}
+                response = await self._invoke_llm(retry_prompt, llm)
+                result = self._parse_json_object(response)
+            return result
             
         except Exception as e:
             # print(f"Error analyzing file {file_info['relative_path']}: {str(e)}")
@@ -4,19 +4,44 @@ from pathlib import Path
 import asyncio
 from typing import Dict, List, Any, Union
 import re
+import uuid
 from datetime import datetime
 from services.db_service import MigrationDBService
 from utils.react_generator_prompts import _build_generation_prompt
+from utils.llm_retry import llm_retry
 import concurrent
 from sqlalchemy.orm import Session
 
+_FENCE_OPEN_RE = re.compile(r'^```[\w]*\n')
+_FENCE_CLOSE_RE = re.compile(r'\n```$')
+_TRAILING_OBJECT_COMMA_RE = re.compile(r',\s*}')
+_TRAILING_ARRAY_COMMA_RE = re.compile(r',\s*]')
+# Default number of file-generation LLM requests a generator keeps in flight at once
+MAX_CONCURRENT_LLM_CALLS = 4
+
+
+def _write_file_atomic(file_path: Path, content: str) -> None:
+    """Write content to a temp file next to file_path, then atomically swap it into place"""
+    tmp_path = file_path.parent / f".{file_path.name}.{uuid.uuid4().hex}.tmp"
+    # Created like open() would (0666 minus the umask), unlike mkstemp's 0600, as it ends up in the user's zip
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
 class ReactComponentGenerator:
     """
     Generates a React application from a predefined migration structure.
     Focuses on creating a clean, structured React project.
     """
     
-    def __init__(self,db : Session,output_dir: Union[str, Path], llm_config: Any,project_id : str,instructions : str = ""):
+    def __init__(self,db : Session,output_dir: Union[str, Path], llm_config: Any,project_id : str,instructions : str = "",
+                 max_concurrent_llm_calls: int = MAX_CONCURRENT_LLM_CALLS):
         """
         Initialize the React project generator.
         
@@ -25,6 +50,7 @@ class ReactComponentGenerator:
             analysis_file: Path to the JSON file containing source file analysis
             output_dir: Directory where the React project will be created
             llm_config: Configuration for the language model
+            max_concurrent_llm_calls: How many files may wait on the LLM at the same time
         """
 
         
@@ -34,6 +60,8 @@ class ReactComponentGenerator:
         self.db = db
         self.project_id = project_id
         self.instructions = instructions
+        # Files are generated concurrently, but only this many LLM requests run at once
+        self._llm_slots = asyncio.Semaphore(max_concurrent_llm_calls)
         # Data containers
         self.migration_data = {}
         self.analysis_data = {}
@@ -107,15 +135,18 @@ class ReactComponentGenerator:
         process_node(data)
         return folder_structure
     
-    def _find_source_file_content(self, source_files: List[str]) -> str:
+    def _find_source_file_parts(self, source_files: List[str]) -> List[str]:
         """
         Enhanced source file content retrieval.
 
+        The matched contents are returned as-is, without concatenating them, so the
+        prompt builder can reference them directly instead of copying a joined string.
+
         Args:
             source_files: List of potential source file paths.
 
         Returns:
-            Concatenated content of source files.
+            Content of each matched source file, in order.
         """
         combined_content = []
 
@@ -146,7 +177,7 @@ class ReactComponentGenerator:
             if matched_content:
                 combined_content.append(matched_content)
         
-        return "\n\n".join(combined_content) if combined_content else ""
+        return combined_content
     
     def _extract_code(self, response: str, file_type: str) -> str:
         """
@@ -160,8 +191,8 @@ class ReactComponentGenerator:
             Cleaned code string
         """
         # Remove markdown code block syntax
-        code = re.sub(r'^```[\w]*\n', '', response)
-        code = re.sub(r'\n```$', '', code)
+        code = _FENCE_OPEN_RE.sub('', response)
+        code = _FENCE_CLOSE_RE.sub('', code)
         
         # Additional cleaning for specific file types
         if file_type == 'json':
@@ -171,8 +202,8 @@ class ReactComponentGenerator:
                 return json.dumps(parsed_json, indent=2)
             except json.JSONDecodeError:
                 # Attempt to fix common JSON issues
-                code = re.sub(r',\s*}', '}', code)
-                code = re.sub(r',\s*]', ']', code)
+                code = _TRAILING_OBJECT_COMMA_RE.sub('}', code)
+                code = _TRAILING_ARRAY_COMMA_RE.sub(']', code)
         
         return code.strip()
     
@@ -238,6 +269,12 @@ class ReactComponentGenerator:
         except Exception as e:
             raise
 
+    @llm_retry
+    async def _invoke_llm(self, prompt: str):
+        """Invoke the LLM, retrying transient provider errors without blocking the event loop"""
+        async with self._llm_slots:
+            return await self.llm_config._langchain_llm.ainvoke(prompt)
+
     async def _generate_single_file_async(self, file_info: Dict[str, Any], file_path: Union[str, Path]):
         """
         Async method to generate a single file
@@ -249,23 +286,22 @@ class ReactComponentGenerator:
             # Convert to Path if it's a string
             file_path = Path(file_path)
             
-            # Find source file content
-            source_content = self._find_source_file_content(
+            # Find source file content, kept as separate parts so it is only copied into the prompt
+            source_parts = self._find_source_file_parts(
                 file_info.get('source_files', [])
             )
             
             # Prepare generation prompt
-            prompt = _build_generation_prompt(source_content, file_info,self.flattened_migration_data,self.instructions)
+            prompt = _build_generation_prompt(source_parts, file_info,self.flattened_migration_data,self.instructions)
             # print(prompt)
             # Generate code using LLM
-            response = self.llm_config._langchain_llm.invoke(prompt)
+            response = await self._invoke_llm(prompt)
             # print(response)
             # Extract and clean code
             generated_code = self._extract_code(response.content, file_info['file_type'])
             
-            # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(generated_code)
+            # Write to file atomically, off the event loop
+            await asyncio.to_thread(_write_file_atomic, file_path, generated_code)
             
         
         except Exception as e:
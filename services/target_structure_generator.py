@@ -1,11 +1,16 @@
 import json
 import os
+import re
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from services.db_service import MigrationDBService
-from utils.target_structre_prompt import target_prompt
+from utils.target_structre_prompt import render_target_prompt
+from utils.llm_retry import llm_retry, JSON_REPROMPT_SUFFIX
 from sqlalchemy.orm import Session
 
+_JSON_BLOCK_RE = re.compile(r'```json\s*([\s\S]*?)\s*```')
+
 # logger = logging.getLogger(__name__)
 
 class ReactMigrationStructureGenerator:
@@ -94,13 +99,64 @@ class ReactMigrationStructureGenerator:
         Returns:
             String containing the prompt for the AI
         """
-        prompt = target_prompt()
-
         # Format the prompt with the analysis data
-        formatted_prompt = prompt.replace("{json_data}", json.dumps(self.analysis_data, indent=2)).replace("{instructions}", self.instructions or "")
-        
-        return formatted_prompt
+        return render_target_prompt(json.dumps(self.analysis_data, indent=2), self.instructions or "")
     
+    @llm_retry
+    async def _invoke_llm(self, prompt: str) -> str:
+        """
+        Send a prompt to the language model, retrying transient provider errors.
+
+        Args:
+            prompt: The full prompt to send
+
+        Returns:
+            The stripped response text
+        """
+        response = await self.llm_config._langchain_llm.ainvoke(prompt)
+        return response.content.strip()
+
+    def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
+        """
+        Extract and parse the JSON object from an LLM response.
+
+        Args:
+            response_text: Raw response text from the LLM
+
+        Returns:
+            Parsed JSON object
+
+        Raises:
+            ValueError: If no valid JSON could be found in the response
+        """
+        # Try to find JSON in the response
+        json_match = _JSON_BLOCK_RE.search(response_text)
+        
+        if json_match:
+            json_str = json_match.group(1).strip()
+            # logger.info("Found JSON in code block")
+        else:
+            # If no code blocks, try to find JSON between curly braces
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                json_str = response_text[json_start:json_end].strip()
+                # logger.info("Found JSON between curly braces")
+            else:
+                # logger.error("No JSON found in response")
+                # logger.error(f"Response text: {response_text}")
+                raise ValueError("Could not find JSON in LLM response")
+        
+        # Parse the JSON
+        try:
+            result = json.loads(json_str)
+            # logger.info("Successfully parsed JSON response")
+            return result
+        except json.JSONDecodeError as e:
+            # logger.error(f"Invalid JSON: {str(e)}")
+            # logger.error(f"JSON string: {json_str}")
+            raise ValueError("LLM response was not valid JSON")
+
     async def _query_llm(self, prompt: str) -> Dict[str, Any]:
         """
         Query the language model with the given prompt.
@@ -117,39 +173,16 @@ class ReactMigrationStructureGenerator:
             
             # Add system message to the prompt
             full_prompt = "You are a React migration expert. Always respond with valid JSON only.\n\n" + prompt
-            response_text = await self.llm_config._langchain_llm.ainvoke(full_prompt)
-            response_text = response_text.content.strip()
+            response_text = await self._invoke_llm(full_prompt)
             
             # logger.info("Received response from LLM")
             
-            # Try to find JSON in the response
-            import re
-            json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
-            
-            if json_match:
-                json_str = json_match.group(1).strip()
-                # logger.info("Found JSON in code block")
-            else:
-                # If no code blocks, try to find JSON between curly braces
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response_text[json_start:json_end].strip()
-                    # logger.info("Found JSON between curly braces")
-                else:
-                    # logger.error("No JSON found in response")
-                    # logger.error(f"Response text: {response_text}")
-                    raise ValueError("Could not find JSON in LLM response")
-            
-            # Parse the JSON
             try:
-                result = json.loads(json_str)
-                # logger.info("Successfully parsed JSON response")
-                return result
-            except json.JSONDecodeError as e:
-                # logger.error(f"Invalid JSON: {str(e)}")
-                # logger.error(f"JSON string: {json_str}")
-                raise ValueError("LLM response was not valid JSON")
+                return self._parse_json_response(response_text)
+            except ValueError:
+                # Give the model one chance to correct malformed output
+                response_text = await self._invoke_llm(full_prompt + JSON_REPROMPT_SUFFIX)
+                return self._parse_json_response(response_text)
                 
         except Exception as e:
             # logger.error(f"Error in LLM query: {str(e)}")
@@ -243,8 +276,7 @@ class ReactMigrationStructureGenerator:
         return count
     
     def _get_timestamp(self) -> str:
-        """Get the current timestamp in ISO format."""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        """Get the current UTC timestamp in ISO format."""
+        return datetime.now(timezone.utc).isoformat()
     
     
\ No newline at end of file
@@ -3,307 +3,423 @@
 Enhanced prompts for AngularJS file analysis focused on migration preparation.
 Each prompt targets a specific file type and requests detailed information
 needed to understand AngularJS code structure and migration complexity.
+
+Every builder returns a {"system": ..., "user": ...} pair. The system prompt holds the
+static role, guidance and JSON schema and is byte-identical across calls of the same
+type, so providers can cache it as a prompt prefix. Only the user message varies per file.
 """
 
-def get_js_prompt(file_name: str, content: str, instructions: str = "") -> str:
-    """Creates a prompt for analyzing JavaScript files."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are a JavaScript analyzer for an AngularJS to React migration project.
-Please analyze this JavaScript file and provide insights in a valid JSON format.
+from typing import Any, Dict, List, Tuple
 
-File: {file_name}
-Content: {content}{instruction_text}
+import orjson
 
-Analysis guidance:
-- Focus on identifying AngularJS-specific patterns that will need migration
-- Check for $scope usage which will need conversion to React state/props
-- Identify service dependencies that will need React context or hooks
-- Note usage of $watch and other lifecycle methods that need React equivalents
-- Pay special attention to DOM manipulation which requires different approach in React
+def _render_schema(skeleton: Dict[str, Any]) -> str:
+    """Renders a response skeleton as indented JSON, once at import, for embedding in a system prompt."""
+    return orjson.dumps(skeleton, option=orjson.OPT_INDENT_2).decode()
 
-IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+JS_SKELETON = {
     "module_declarations": [],
     "controllers": [
-        {{
+        {
             "name": "",
             "dependencies": [],
             "scope_usage": []
-        }}
+        }
     ],
     "services": [
-        {{
+        {
             "name": "",
-            "type": "",  
+            "type": "",
             "dependencies": []
-        }}
+        }
     ],
     "directives": [
-        {{
+        {
             "name": "",
-            "requires_template": false,
-            "dom_manipulation": false
-        }}
+            "requires_template": False,
+            "dom_manipulation": False
+        }
     ],
     "scope_variables": [],
     "dependencies": [],
     "watchers": [
-        {{
+        {
             "watched_expression": "",
             "complexity": ""
-        }}
+        }
     ],
     "api_calls": [
-        {{
+        {
             "endpoint": "",
             "method": "",
             "service": ""
-        }}
+        }
     ],
-    "routing_config": {{
-        "has_routing": false,
+    "routing_config": {
+        "has_routing": False,
         "routes": [
-            {{
+            {
                 "path": "",
                 "template": "",
                 "controller": ""
-            }}
+            }
         ]
-    }},
+    },
     "template_bindings": [],
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
-
-Return ONLY the JSON object, no other text."""
-
-def get_html_prompt(file_name: str, content: str, instructions: str = "") -> str:
-    """Creates a prompt for analyzing HTML template files."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are an HTML analyzer for an AngularJS to React migration project.
-Please analyze this HTML template file and provide insights in a valid JSON format.
+}
 
-File: {file_name}
-Content: {content}{instruction_text}
+JS_SYSTEM = f"""You are a JavaScript analyzer for an AngularJS to React migration project.
+Please analyze the JavaScript file provided by the user and provide insights in a valid JSON format.
 
 Analysis guidance:
-- Identify all ng-* directives which will need React equivalents
-- Note usage of filters which need to be converted to JavaScript functions
-- Identify form validation approaches that will need React form libraries
-- Pay attention to ng-if, ng-repeat, ng-show which need conditional rendering in React
-- Look for ng-include which needs component composition in React
+- Focus on identifying AngularJS-specific patterns that will need migration
+- Check for $scope usage which will need conversion to React state/props
+- Identify service dependencies that will need React context or hooks
+- Note usage of $watch and other lifecycle methods that need React equivalents
+- Pay special attention to DOM manipulation which requires different approach in React
 
 IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+{_render_schema(JS_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+HTML_SKELETON = {
     "directives_used": [
-        {{
+        {
             "name": "",
             "count": 0,
             "react_equivalent": ""
-        }}
+        }
     ],
     "controllers": [],
     "filters_used": [
-        {{
+        {
             "name": "",
             "count": 0
-        }}
+        }
     ],
     "scope_bindings": [
-        {{
+        {
             "expression": "",
             "binding_type": "one-way|two-way|event"
-        }}
+        }
     ],
     "events": [
-        {{
+        {
             "name": "",
             "handler": ""
-        }}
+        }
     ],
     "includes": [],
-    "form_validation": {{
-        "has_forms": false,
+    "form_validation": {
+        "has_forms": False,
         "validation_types": [],
         "custom_validators": []
-    }},
+    },
     "ui_components": [
-        {{
+        {
             "name": "",
             "complexity": "low|medium|high"
-        }}
+        }
     ],
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
-
-Return ONLY the JSON object, no other text."""
+}
 
-def get_css_prompt(file_name: str, content: str, instructions: str = "") -> str:
-    """Creates a prompt for analyzing CSS files."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are a CSS analyzer for an AngularJS to React migration project.
-Please analyze this CSS file and provide insights in a valid JSON format.
-
-File: {file_name}
-Content: {content}{instruction_text}
+HTML_SYSTEM = f"""You are an HTML analyzer for an AngularJS to React migration project.
+Please analyze the HTML template file provided by the user and provide insights in a valid JSON format.
 
 Analysis guidance:
-- Identify selectors that target AngularJS-specific attributes (ng-*)
-- Note any !important flags that may complicate component styling in React
-- Look for global styles that would need to be scoped in React components
-- Check for vendor prefixes and browser compatibility issues
-- Identify any complex animations that might need React animation libraries
+- Identify all ng-* directives which will need React equivalents
+- Note usage of filters which need to be converted to JavaScript functions
+- Identify form validation approaches that will need React form libraries
+- Pay attention to ng-if, ng-repeat, ng-show which need conditional rendering in React
+- Look for ng-include which needs component composition in React
 
 IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+{_render_schema(HTML_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+CSS_SKELETON = {
     "selectors_count": 0,
     "angular_specific_selectors": [],
     "major_components": [
-        {{
+        {
             "name": "",
             "selector": "",
             "complexity": "low|medium|high"
-        }}
+        }
     ],
     "animation_effects": [
-        {{
+        {
             "type": "",
             "complexity": "low|medium|high"
-        }}
+        }
     ],
-    "responsive_design": {{
-        "has_responsive": false,
+    "responsive_design": {
+        "has_responsive": False,
         "breakpoints": [],
-        "mobile_first": false
-    }},
+        "mobile_first": False
+    },
     "third_party": [],
     "global_styles": [],
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
-
-Return ONLY the JSON object, no other text."""
+}
 
-def get_json_prompt(file_name: str, content: str, instructions: str = "") -> str:
-    """Creates a prompt for analyzing JSON configuration files."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are a JSON analyzer for an AngularJS to React migration project.
-Please analyze this JSON configuration file and provide insights in a valid JSON format.
-
-File: {file_name}
-Content: {content}{instruction_text}
+CSS_SYSTEM = f"""You are a CSS analyzer for an AngularJS to React migration project.
+Please analyze the CSS file provided by the user and provide insights in a valid JSON format.
 
 Analysis guidance:
-- Determine if this is a package.json, angular.json, or other config file
-- Identify AngularJS dependencies that will need React alternatives
-- Note build tools and processes that will need updating
-- Look for custom configurations specific to the AngularJS application
-- Check for environment configurations that will need migration
+- Identify selectors that target AngularJS-specific attributes (ng-*)
+- Note any !important flags that may complicate component styling in React
+- Look for global styles that would need to be scoped in React components
+- Check for vendor prefixes and browser compatibility issues
+- Identify any complex animations that might need React animation libraries
 
 IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+{_render_schema(CSS_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+JSON_SKELETON = {
     "purpose": "",
     "key_structures": [],
     "dependencies": [
-        {{
+        {
             "name": "",
             "version": "",
             "react_alternative": ""
-        }}
+        }
     ],
-    "build_config": {{
+    "build_config": {
         "tools": [],
         "scripts": [],
         "environments": []
-    }},
+    },
     "angular_specific": [],
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
-
-Return ONLY the JSON object, no other text."""
-
-def get_default_prompt(file_name: str, content: str, file_type: str, instructions: str = "") -> str:
-    """Creates a generic prompt for analyzing other file types."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are a file analyzer for an AngularJS to React migration project.
-Please analyze this {file_type} file and provide insights in a valid JSON format.
+}
 
-File: {file_name}
-Content: {content}{instruction_text}
+JSON_SYSTEM = f"""You are a JSON analyzer for an AngularJS to React migration project.
+Please analyze the JSON configuration file provided by the user and provide insights in a valid JSON format.
 
 Analysis guidance:
-- Determine how this file relates to the AngularJS application architecture
-- Identify any AngularJS-specific code or references
-- Note dependencies or connections to other parts of the application
-- Consider how this file would need to be handled in a React application
+- Determine if this is a package.json, angular.json, or other config file
+- Identify AngularJS dependencies that will need React alternatives
+- Note build tools and processes that will need updating
+- Look for custom configurations specific to the AngularJS application
+- Check for environment configurations that will need migration
 
 IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+{_render_schema(JSON_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+DEFAULT_SKELETON = {
     "file_purpose": "",
     "relation_to_angular": "",
     "dependencies": [],
     "references": [
-        {{
+        {
             "type": "",
             "name": "",
             "context": ""
-        }}
+        }
     ],
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
-
-Return ONLY the JSON object, no other text."""
+}
 
-def get_test_prompt(file_name: str, content: str, instructions: str = "") -> str:
-    """Creates a prompt for analyzing test files (spec.js)."""
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    
-    return f"""You are a test analyzer for an AngularJS to React migration project.
-Please analyze this test file and provide insights in a valid JSON format.
-
-File: {file_name}
-Content: {content}{instruction_text}
+DEFAULT_SYSTEM = f"""You are a file analyzer for an AngularJS to React migration project.
+Please analyze the file provided by the user and provide insights in a valid JSON format.
 
 Analysis guidance:
-- Identify test framework being used (Jasmine, Karma, etc.)
-- Note AngularJS-specific test utilities like $httpBackend or $controller
-- Identify mocked dependencies and services
-- Check for DOM testing approaches that will need different libraries in React
-- Consider how these tests would be rewritten using React Testing Library or Jest
+- Determine how this file relates to the AngularJS application architecture
+- Identify any AngularJS-specific code or references
+- Note dependencies or connections to other parts of the application
+- Consider how this file would need to be handled in a React application
 
 IMPORTANT: Your response must be ONLY valid JSON in this exact format:
-{{
+{_render_schema(DEFAULT_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+TEST_SKELETON = {
     "test_framework": "",
     "test_cases": [
-        {{
+        {
             "description": "",
             "component_tested": "",
             "mocks": []
-        }}
+        }
     ],
     "angular_test_utils": [],
     "dom_assertions": [],
-    "async_testing": false,
-    "coverage": {{
-        "has_coverage": false,
+    "async_testing": False,
+    "coverage": {
+        "has_coverage": False,
         "coverage_type": ""
-    }},
+    },
     "migration_complexity": "low|medium|high",
     "complexity_factors": [],
     "summary": ""
-}}
+}
+
+TEST_SYSTEM = f"""You are a test analyzer for an AngularJS to React migration project.
+Please analyze the test file provided by the user and provide insights in a valid JSON format.
+
+Analysis guidance:
+- Identify test framework being used (Jasmine, Karma, etc.)
+- Note AngularJS-specific test utilities like $httpBackend or $controller
+- Identify mocked dependencies and services
+- Check for DOM testing approaches that will need different libraries in React
+- Consider how these tests would be rewritten using React Testing Library or Jest
+
+IMPORTANT: Your response must be ONLY valid JSON in this exact format:
+{_render_schema(TEST_SKELETON)}
+
+Return ONLY the JSON object, no other text."""
+
+# Longest file content sent to the model; the analysis guidance only needs the first part of a file,
+# and bundled/minified files would otherwise overflow the context window
+MAX_CONTENT_CHARS = 32_768
+
+def _cap_content(content: str, limit: int = MAX_CONTENT_CHARS) -> str:
+    """Truncates content to limit characters, marking how much was cut."""
+    if len(content) <= limit:
+        return content
+    return f"{content[:limit]}\n...[truncated, {len(content) - limit} more characters]"
+
+def _user_prompt(file_name: str, content: str, instructions: str = "", file_type: str = "") -> str:
+    """Builds the per-file user message in a single join, so content is copied once."""
+    parts = [f"File type: {file_type}\n"] if file_type else []
+    parts += ("File: ", file_name, "\nContent: ", _cap_content(content))
+    if instructions:
+        parts += ("\nAdditional instructions: ", instructions)
+    return "".join(parts)
+
+def get_js_prompt(file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a prompt for analyzing JavaScript files."""
+    return {"system": JS_SYSTEM, "user": _user_prompt(file_name, content, instructions)}
+
+def get_html_prompt(file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a prompt for analyzing HTML template files."""
+    return {"system": HTML_SYSTEM, "user": _user_prompt(file_name, content, instructions)}
+
+def get_css_prompt(file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a prompt for analyzing CSS files."""
+    return {"system": CSS_SYSTEM, "user": _user_prompt(file_name, content, instructions)}
+
+def get_json_prompt(file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a prompt for analyzing JSON configuration files."""
+    return {"system": JSON_SYSTEM, "user": _user_prompt(file_name, content, instructions)}
+
+def get_default_prompt(file_name: str, content: str, file_type: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a generic prompt for analyzing other file types."""
+    return {"system": DEFAULT_SYSTEM, "user": _user_prompt(file_name, content, instructions, file_type)}
+
+def get_test_prompt(file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates a prompt for analyzing test files (spec.js)."""
+    return {"system": TEST_SYSTEM, "user": _user_prompt(file_name, content, instructions)}
+
+# File type -> prompt builder; types without an entry use get_default_prompt
+PROMPT_BUILDERS = {
+    "js": get_js_prompt,
+    "html": get_html_prompt,
+    "css": get_css_prompt,
+    "json": get_json_prompt,
+}
+
+def build_prompt(file_type: str, file_name: str, content: str, instructions: str = "") -> Dict[str, str]:
+    """Creates the analysis prompt for a file, dispatching on its type."""
+    builder = PROMPT_BUILDERS.get(file_type)
+    if builder is None:
+        return get_default_prompt(file_name, content, file_type, instructions)
+    return builder(file_name, content, instructions)
+
+# File type -> expected type of each top-level response field, derived once from the skeletons
+_RESPONSE_FIELD_TYPES = {
+    file_type: {key: type(value) for key, value in skeleton.items()}
+    for file_type, skeleton in (
+        ("js", JS_SKELETON),
+        ("html", HTML_SKELETON),
+        ("css", CSS_SKELETON),
+        ("json", JSON_SKELETON),
+    )
+}
+_DEFAULT_FIELD_TYPES = {key: type(value) for key, value in DEFAULT_SKELETON.items()}
+
+def validate_analysis(file_type: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checks an analysis response against the top-level fields of its skeleton.
+    Missing or wrongly typed fields are replaced, in place, with an empty value of the expected type.
+    """
+    field_types = _RESPONSE_FIELD_TYPES.get(file_type, _DEFAULT_FIELD_TYPES)
+    for key, expected_type in field_types.items():
+        if not isinstance(analysis.get(key), expected_type):
+            analysis[key] = expected_type()
+    return analysis
+
+
+# Limits for analyzing several files of one type in a single request
+MAX_BATCH_FILES = 8
+MAX_BATCH_CHARS = 65_536
+# The whole batch response must fit the deployment's output limit (about 3k tokens here, below the
+# 4k that older gpt-4o deployments allow); a filled-in analysis runs to a few times its skeleton's size
+MAX_BATCH_OUTPUT_CHARS = 12_000
+_ANALYSIS_SIZE_FACTOR = 4
+
+# File type -> expected characters of one analysis response, derived once from the skeletons
+_EXPECTED_ANALYSIS_CHARS = {
+    file_type: _ANALYSIS_SIZE_FACTOR * len(_render_schema(skeleton))
+    for file_type, skeleton in (
+        ("js", JS_SKELETON),
+        ("html", HTML_SKELETON),
+        ("css", CSS_SKELETON),
+        ("json", JSON_SKELETON),
+    )
+}
+_DEFAULT_EXPECTED_ANALYSIS_CHARS = _ANALYSIS_SIZE_FACTOR * len(_render_schema(DEFAULT_SKELETON))
+
+def max_batch_files(file_type: str) -> int:
+    """Most files of file_type whose analyses are expected to fit in one batch response."""
+    expected = _EXPECTED_ANALYSIS_CHARS.get(file_type, _DEFAULT_EXPECTED_ANALYSIS_CHARS)
+    return max(1, min(MAX_BATCH_FILES, MAX_BATCH_OUTPUT_CHARS // expected))
+
+BATCH_SUFFIX = """
+
+The user message contains several files, each starting with a "File:" line.
+Analyze each file separately. Return ONLY a JSON object that maps each file path, exactly as given,
+to that file's analysis in the format above, no other text."""
+
+# Batch system prompts share the single-file prefix, so they hit the same provider prompt cache
+_BATCH_SYSTEMS = {
+    system: system + BATCH_SUFFIX
+    for system in (JS_SYSTEM, HTML_SYSTEM, CSS_SYSTEM, JSON_SYSTEM, DEFAULT_SYSTEM, TEST_SYSTEM)
+}
+
+def build_batch_prompt(file_type: str, files: List[Tuple[str, str]], instructions: str = "") -> Dict[str, str]:
+    """
+    Creates one prompt analyzing several files of the same type.
 
-Return ONLY the JSON object, no other text."""
\ No newline at end of file
+    Args:
+        file_type: Type shared by all files in the batch
+        files: (relative_path, content) pairs; paths are the keys of the expected response object
+        instructions: Additional user instructions, sent once for the whole batch
+    """
+    system = build_prompt(file_type, "", "")["system"]
+    default_type = file_type if file_type not in PROMPT_BUILDERS else ""
+    sections = [_user_prompt(path, content, file_type=default_type) for path, content in files]
+    if instructions:
+        sections.append(f"Additional instructions: {instructions}")
+    return {"system": _BATCH_SYSTEMS[system], "user": "\n\n".join(sections)}
@@ -1,39 +1,121 @@
 import os
+import re
+import stat
 import shutil
+import signal
 import asyncio
+import subprocess
 import psutil
-from typing import Optional
+from typing import List, Optional
 
 # Base directories, to be imported from a config file in a real implementation
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
 
+_DIR_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+# Exact process names matched by the psutil fallback; substring matches would hit e.g. github-desktop
+_GIT_PROCESS_NAMES = frozenset(('git', 'git.exe'))
+# Seconds to wait for terminated Git processes to exit
+_GIT_EXIT_TIMEOUT = 3
+
+def _terminate_git_processes_psutil() -> None:
+    """Fallback for hosts without pgrep: scan the process table with psutil"""
+    terminated = []
+    for process in psutil.process_iter(['name']):
+        name = process.info['name']
+        if not name or name.lower() not in _GIT_PROCESS_NAMES:
+            continue
+        try:
+            process.terminate()
+            terminated.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass  # Process already closed or permission denied
+
+    # Reap the processes so they release their file locks before cleanup starts
+    if terminated:
+        psutil.wait_procs(terminated, timeout=_GIT_EXIT_TIMEOUT)
+
+def _terminate_git_processes_sync() -> None:
+    """Terminate Git processes with one pgrep/taskkill call instead of a full process scan"""
+    if os.name == 'nt':  # Windows
+        subprocess.run(["taskkill", "/F", "/IM", "git.exe"], capture_output=True)
+        return
+
+    try:
+        result = subprocess.run(["pgrep", "-i", "^git$"], capture_output=True, text=True)
+    except FileNotFoundError:
+        _terminate_git_processes_psutil()
+        return
+
+    for pid in result.stdout.split():
+        try:
+            os.kill(int(pid), signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass  # Process already closed or permission denied
+
 async def terminate_git_processes() -> None:
     """Terminate any Git processes before cleanup"""
-    for process in psutil.process_iter(['pid', 'name']):
-        if 'git' in process.info['name'].lower():
-            try:
-                process.terminate()
-            except (psutil.NoSuchProcess, PermissionError):
-                pass  # Process already closed or permission denied
+    await asyncio.to_thread(_terminate_git_processes_sync)
+
+def _force_remove(func, path, exc) -> None:
+    """
+    rmtree error handler: make a read-only entry (e.g. a Git pack file on Windows) writable and retry.
+    Only failed unlink/rmdir calls are retried; any remaining failure is logged and skipped,
+    so one locked file does not stop the rest of the tree from being removed.
+    """
+    if func not in (os.unlink, os.rmdir):
+        print(f"Error during directory removal: {str(exc)}")
+        return
+    try:
+        os.chmod(path, os.stat(path).st_mode | stat.S_IWRITE)
+        func(path)
+    except OSError as e:
+        print(f"Error during directory removal: {str(e)}")
+
+def _list_subdirectories(dir_path: str) -> List[str]:
+    """List the immediate subdirectories of dir_path (symlinks and junctions excluded)"""
+    with os.scandir(dir_path) as entries:
+        return [
+            entry.path for entry in entries
+            if entry.is_dir(follow_symlinks=False) and not entry.is_junction()
+        ]
+
+def _is_real_directory(path: str) -> bool:
+    """
+    True if path is a directory itself. Symlinks and Windows junctions (which must never be
+    descended into), dangling links and plain files are not, and are simply unlinked
+    """
+    return stat.S_ISDIR(os.lstat(path).st_mode) and not os.path.isjunction(path)
+
+async def _rmtree(dir_path: str) -> None:
+    """Remove a directory tree, deleting its top-level subtrees concurrently in worker threads"""
+    # scandir follows a linked root, which would delete the link target's contents outside base_dir
+    if not await asyncio.to_thread(_is_real_directory, dir_path):
+        await asyncio.to_thread(os.unlink, dir_path)
+        return
+
+    subdirectories = await asyncio.to_thread(_list_subdirectories, dir_path)
+    await asyncio.gather(*(
+        asyncio.to_thread(shutil.rmtree, subdirectory, onexc=_force_remove)
+        for subdirectory in subdirectories
+    ))
+    # Remaining files, symlinks and the directory itself
+    await asyncio.to_thread(shutil.rmtree, dir_path, onexc=_force_remove)
 
 async def cleanup_directory(base_dir: str, dir_id: str) -> None:
     """Clean up a directory given a base directory and ID"""
     try:
-        # Ensure response is fully sent before cleanup starts
-        await asyncio.sleep(1)
-        
+        # Only plain IDs are allowed, anything else could escape base_dir
+        if not dir_id or not _DIR_ID_RE.fullmatch(dir_id):
+            print(f"Refusing to clean up invalid directory ID: {dir_id!r}")
+            return
+
         dir_path = os.path.join(base_dir, dir_id)
-        if dir_id and os.path.exists(dir_path):
+        # Nothing to remove is the common case, a single lstat avoids any thread-pool work.
+        # lexists also matches links (dangling or not) and files, which _rmtree unlinks
+        if os.path.lexists(dir_path):
             try:
-                shutil.rmtree(dir_path, ignore_errors=True)
-                
-                # If directory still exists after rmtree, try force removal
-                if os.path.exists(dir_path):
-                    if os.name == 'nt':  # Windows
-                        os.system(f'rmdir /S /Q "{dir_path}"')
-                    else:  # Unix/Linux
-                        os.system(f'rm -rf "{dir_path}"')
+                await _rmtree(dir_path)
             except Exception as e:
                 print(f"Error during directory removal: {str(e)}")
     except Exception as e:
@@ -42,11 +124,8 @@ async def cleanup_directory(base_dir: str, dir_id: str) -> None:
 async def cleanup_file(file_path: Optional[str]) -> None:
     """Clean up a file given its path"""
     try:
-        # Ensure response is fully sent before cleanup starts
-        await asyncio.sleep(1)
-        
-        if file_path and os.path.exists(file_path):
-            os.unlink(file_path)
+        if file_path and os.path.lexists(file_path):
+            await asyncio.to_thread(os.unlink, file_path)
     except Exception as e:
         print(f"Error during file cleanup: {str(e)}")
 
@@ -68,13 +147,22 @@ async def cleanup_temp_file(temp_path: str) -> None:
     await cleanup_file(temp_path)
 
 async def perform_full_cleanup(project_id: str, zip_path: Optional[str] = None, temp_path: Optional[str] = None) -> None:
-    """Perform a full cleanup of all resources"""
+    """
+    Perform a full cleanup of all resources.
+    Routes schedule this as a BackgroundTasks task, which Starlette runs only after the
+    response (including a streamed FileResponse) has been sent, so no delay is needed here.
+    """
+    # Git must be stopped first, it holds file locks in the uploads folder on Windows
     await terminate_git_processes()
-    await cleanup_uploads(project_id)
-    await cleanup_outputs(project_id)
-    
+
+    # The remaining targets are disjoint paths, remove them concurrently
+    cleanups = [
+        cleanup_directory(UPLOAD_DIR, project_id),
+        cleanup_outputs(project_id)
+    ]
     if zip_path:
-        await cleanup_zip(zip_path)
-    
+        cleanups.append(cleanup_zip(zip_path))
     if temp_path:
-        await cleanup_temp_file(temp_path)
\ No newline at end of file
+        cleanups.append(cleanup_temp_file(temp_path))
+
+    await asyncio.gather(*cleanups)
\ No newline at end of file
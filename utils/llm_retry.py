@@ -0,0 +1,44 @@
+"""
+Shared retry policy for LLM calls.
+Transient provider errors (rate limits, connection drops, timeouts, 5xx) are retried
+with jittered exponential backoff instead of failing the whole migration step.
+"""
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+MAX_ATTEMPTS = 5
+MAX_WAIT_SECONDS = 60
+
+# Appended to a prompt when the previous response could not be parsed as JSON
+JSON_REPROMPT_SUFFIX = "\n\nThe previous response was not valid JSON. Return ONLY a valid JSON object, no prose."
+
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError, TimeoutError)
+
+_backoff = wait_random_exponential(multiplier=1, max=MAX_WAIT_SECONDS)
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """Honour the server's retry-after header on 429s, otherwise back off with jitter"""
+    error = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(error, RateLimitError):
+        try:
+            return min(float(error.response.headers.get("retry-after")), MAX_WAIT_SECONDS)
+        except (TypeError, ValueError):
+            pass
+    return _backoff(retry_state)
+
+
+# Decorator for sync or async functions that call the LLM
+llm_retry = retry(
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    wait=_wait_for_retry,
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    reraise=True,
+)
@@ -1,6 +1,27 @@
-def clean_migration_data(data):
+"""
+Cleaning of migration (target structure) data.
+
+This module is kept compatible with mypyc: running ``mypyc utils/migration_data_cleaner.py``
+builds a C extension next to this file, which Python imports in preference to it.
+The pure-Python source remains the portable fallback when no compiled module is present.
+"""
+
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+# Keys that mark a dict as a file entry
+_FILE_KEYS = frozenset(('file_name', 'file_type', 'relative_path'))
+# Folder keys that are kept (and cleaned) when they exist
+_FOLDER_ALLOWED_KEYS = frozenset(('public', 'src', 'components', 'services', 'directives', 'styles', 'files'))
+
+def clean_migration_data(data: Any) -> Any:
     """
-    Recursively clean migration data by removing unnecessary metadata from folder entries.
+    Clean migration data by removing unnecessary metadata from folder entries.
+    
+    Walks the tree iteratively with an explicit stack, so deeply nested folder
+    chains cost no Python call frames and cannot hit the recursion limit.
+    Folders that need no cleaning are returned as-is rather than copied, so the
+    result shares unchanged subtrees with the input.
     
     Args:
         data (dict): The migration data dictionary to clean
@@ -8,48 +29,65 @@ def clean_migration_data(data):
     Returns:
         dict: Cleaned migration data with folder metadata removed
     """
-    def clean_node(node):
-        # If node is not a dictionary, return it as is
-        if not isinstance(node, dict):
-            return node
-        
-        # Create a copy of the node to avoid modifying the original
-        cleaned_node = {}
-        
-        # List of keys to preserve if they exist for folders
-        folder_allowed_keys = ['public', 'src', 'components', 'services', 'directives', 'styles']
-        
+    # If data is not a dictionary, return it as is
+    if not isinstance(data, dict):
+        return data
+    
+    # Collect every folder that will be kept, parents before children
+    folders: List[Dict[str, Any]] = []
+    stack: List[Dict[str, Any]] = [data]
+    while stack:
+        node = stack.pop()
+        folders.append(node)
         for key, value in node.items():
-            # If value is a dictionary and looks like a folder
-            if isinstance(value, dict):
-                # Check if this is a file entry (has specific file metadata)
-                if any(k in value for k in ['file_name', 'file_type', 'relative_path']):
-                    # This is a file entry, keep all its metadata
-                    cleaned_node[key] = value
-                elif key in folder_allowed_keys or key == 'files':
-                    # This is a folder, recursively clean its contents
-                    cleaned_node[key] = clean_node(value)
+            if isinstance(value, dict) and key in _FOLDER_ALLOWED_KEYS and value.keys().isdisjoint(_FILE_KEYS):
+                stack.append(value)
+    
+    # Clean children before their parents, only copying a folder once something in it changes
+    cleaned_folders: Dict[int, Dict[str, Any]] = {}
+    for index in range(len(folders) - 1, -1, -1):
+        node = folders[index]
+        cleaned_node: Optional[Dict[str, Any]] = None
+        for position, (key, value) in enumerate(node.items()):
+            keep = True
+            value_cleaned: Any = None
+            # If value is a dictionary without file metadata, it is a folder
+            if isinstance(value, dict) and value.keys().isdisjoint(_FILE_KEYS):
+                if key in _FOLDER_ALLOWED_KEYS:
+                    value_cleaned = cleaned_folders[id(value)]
+                else:
+                    keep = False
             else:
-                # For non-dictionary values, keep them as is
-                cleaned_node[key] = value
+                # File entries and non-dictionary values are kept as is
+                value_cleaned = value
+            
+            if cleaned_node is None:
+                if keep and value_cleaned is value:
+                    continue
+                # First change in this folder: copy the keys seen so far
+                cleaned_node = dict(islice(node.items(), position))
+            if keep:
+                cleaned_node[key] = value_cleaned
         
-        return cleaned_node
+        cleaned_folders[id(node)] = node if cleaned_node is None else cleaned_node
     
-    # Clean the entire data structure
-    return clean_node(data)
+    return cleaned_folders[id(data)]
 
 class MigrationDataProcessor:
-    def __init__(self, migration_data):
+    def __init__(self, migration_data: Dict[str, Any]) -> None:
         """
         Initialize the Migration Data Processor
         
+        The cleaned data shares unchanged subtrees with the original (it is the
+        very same object when nothing needed cleaning), so no extra copy is kept.
+        
         Args:
             migration_data (dict): The original migration data
         """
         self.original_data = migration_data
         self.migration_data = clean_migration_data(migration_data)
     
-    def get_cleaned_data(self):
+    def get_cleaned_data(self) -> Dict[str, Any]:
         """
         Return the cleaned migration data
         
@@ -58,7 +96,7 @@ class MigrationDataProcessor:
         """
         return self.migration_data
     
-    def restore_original_data(self):
+    def restore_original_data(self) -> Dict[str, Any]:
         """
         Restore the original migration data
         
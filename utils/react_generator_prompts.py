@@ -1,66 +1,98 @@
-from typing import Any, Dict  
+from typing import Any, Dict, Sequence, Union
 
-def _build_generation_prompt(source_content: str, file_info: Dict[str, Any],flattend_migration_data:Dict[str, Any],instructions : str = "") -> str:
-    """
-    Build a structured prompt for generating a React file based on AngularJS source content.
+# Static sections of the generation prompt, built once at import; only the file details vary per call.
+# The text is flush-left so no indentation is sent to the model
+_INTRO = "You are a React migration assistant. Convert the given AngularJS file into an optimized React "
 
-    Args:
-        source_content: Source content for the file from the AngularJS project.
-        file_info: Metadata about the file to be generated, including description, dependencies, and migration suggestions.
+_GUIDELINES = """
 
-    Returns:
-        A well-structured prompt string to guide the AI in generating an optimized React file.
-    """
-    instruction_text = f"\nAdditional instructions: {instructions}" if instructions else ""
-    # Base prompt template
-    base_prompt = f"""
-    You are a React migration assistant. Convert the given AngularJS file into an optimized React {file_info['file_type']} file while following best practices.
+## **Generation Guidelines:**
+1. **Follow Modern React Practices:** Use functional components, hooks, and ES6+ syntax.
+2. **Preserve Component Structure:** Maintain component purpose and functionality while adapting it to React conventions.
+3. **Implement Required Dependencies:** Ensure all necessary dependencies (React libraries, local imports, and third-party modules) are correctly included.
+4. **Maintain Routing Behavior:** If the component interacts with routing, use `react-router-dom`, but **handle all routing logic in `App.js`** rather than defining it in each component.
+5. **Optimize Code Structure:** Ensure code clarity, modularization, and maintainability.
 
-    ### **File Details:**
-    - **Target Path:** `{file_info['relative_path']}`
-    - **File Type:** `{file_info['file_type']}`
-    - **Description:** {file_info.get('description', 'No description provided.')}
-    - **Dependencies:** {', '.join(file_info.get('dependencies', [])) if file_info.get('dependencies') else 'None'}
-    - **Migration Suggestions:** {file_info.get('migration_suggestions', 'No migration instructions provided.')}
+## **CSS & Styling Rules:**
+- **DO NOT** generate inline styles or `styled-components` if a CSS file exists for the component or if global styles handle the design.
+- **USE** existing CSS classes instead of generating new styles unless absolutely necessary.
+- **PRESERVE** the CSS structure from the AngularJS project—do not modify styles unless required for React compatibility.
+- **AVOID** unnecessary CSS files—if a CSS file was not present in the original AngularJS structure, do not generate one.
 
-    {f"### **Source Content:**\n```\n{source_content}\n```" if source_content else "No source content available."}
+## **Preserving Data & Logic:**
+- **DO NOT** transform static data into API calls—if the AngularJS code had hardcoded values, keep them hardcoded in React.
+- **DO NOT** introduce additional state management solutions unless required.
+- **KEEP** the logic consistent with the original implementation unless changes are necessary for React migration.
 
-    ## **Generation Guidelines:**
-    1. **Follow Modern React Practices:** Use functional components, hooks, and ES6+ syntax.
-    2. **Preserve Component Structure:** Maintain component purpose and functionality while adapting it to React conventions.
-    3. **Implement Required Dependencies:** Ensure all necessary dependencies (React libraries, local imports, and third-party modules) are correctly included.
-    4. **Maintain Routing Behavior:** If the component interacts with routing, use `react-router-dom`, but **handle all routing logic in `App.js`** rather than defining it in each component.
-    5. **Optimize Code Structure:** Ensure code clarity, modularization, and maintainability.
+## **Return Instructions:**
+- Generate **only** the complete and functional React `"""
 
-    ## **CSS & Styling Rules:**
-    - **DO NOT** generate inline styles or `styled-components` if a CSS file exists for the component or if global styles handle the design.
-    - **USE** existing CSS classes instead of generating new styles unless absolutely necessary.
-    - **PRESERVE** the CSS structure from the AngularJS project—do not modify styles unless required for React compatibility.
-    - **AVOID** unnecessary CSS files—if a CSS file was not present in the original AngularJS structure, do not generate one.
+_NOTES = """` file.
+- Do **not** include explanations, extra comments, or additional notes—only return the code.
+## **Additional Notes:**
+- &lt;Route&gt; uses element=&lt;YourComponent /&gt; instead of component=YourComponent.
+- Replace $routeProvider with react-router-dom's <Routes> and <Route>.
+- Define routes inside <Routes> using <Route path="..." element=Component />.
+- Move navigation logic to useNavigate() instead of $location.path().
+- Ensure all route components are function components.
+- Include BrowserRouter or MemoryRouter at the top level."
+- DO NOT use generic import paths like 'path/to/...'. Always use the correct relative path from the project structure.
+- NEVER create a new file or assume a missing dependency—omit it from the imports instead.
+- Refer the folder structure for imports give abosolute paths correctly for imports `"""
 
-    ## **Preserving Data & Logic:**
-    - **DO NOT** transform static data into API calls—if the AngularJS code had hardcoded values, keep them hardcoded in React.
-    - **DO NOT** introduce additional state management solutions unless required.
-    - **KEEP** the logic consistent with the original implementation unless changes are necessary for React migration.
+_CLOSING = """`
+- Use either browser router or router dont use both
+- Dont add unnecessrt comments and place holders
+- Dont use lazy loading import components properly
+# Additional instructions: """
 
-    ## **Return Instructions:**
-    - Generate **only** the complete and functional React `{file_info['file_type']}` file.
-    - Do **not** include explanations, extra comments, or additional notes—only return the code.
-    ## **Additional Notes:**
-    - &lt;Route&gt; uses element=&lt;YourComponent /&gt; instead of component=YourComponent.
-    - Replace $routeProvider with react-router-dom's <Routes> and <Route>.
-    - Define routes inside <Routes> using <Route path="..." element=Component />.
-    - Move navigation logic to useNavigate() instead of $location.path().
-    - Ensure all route components are function components.
-    - Include BrowserRouter or MemoryRouter at the top level."
-    - DO NOT use generic import paths like 'path/to/...'. Always use the correct relative path from the project structure.
-    - NEVER create a new file or assume a missing dependency—omit it from the imports instead.
-    - Refer the folder structure for imports give abosolute paths correctly for imports `{flattend_migration_data}`
-    - Use either browser router or router dont use both
-    - Dont add unnecessrt comments and place holders
-    - Dont use lazy loading import components properly
-    # Additional instructions: {instruction_text}
+def _build_generation_prompt(source_content: Union[str, Sequence[str]], file_info: Dict[str, Any],flattend_migration_data:Dict[str, Any],instructions : str = "") -> str:
+    """
+    Build a structured prompt for generating a React file based on AngularJS source content.
+
+    The prompt is assembled from a list of fragments in a single join, so the (possibly large)
+    source content is copied exactly once.
 
+    Args:
+        source_content: Source content for the file from the AngularJS project, either as one
+            string or as the content of each source file (separated by a blank line in the prompt).
+        file_info: Metadata about the file to be generated, including description, dependencies, and migration suggestions.
+
+    Returns:
+        A well-structured prompt string to guide the AI in generating an optimized React file.
     """
+    file_type = str(file_info['file_type'])
+    dependencies = file_info.get('dependencies')
+    # Most files have zero or one dependency; only join when there are several
+    if not dependencies:
+        dependencies_text = 'None'
+    elif len(dependencies) == 1:
+        dependencies_text = dependencies[0]
+    else:
+        dependencies_text = ', '.join(dependencies)
 
-    return base_prompt
+    parts = [
+        _INTRO, file_type, " file while following best practices.\n\n### **File Details:**\n",
+        "- **Target Path:** `", str(file_info['relative_path']), "`\n",
+        "- **File Type:** `", file_type, "`\n",
+        "- **Description:** ", str(file_info.get('description', 'No description provided.')), "\n",
+        "- **Dependencies:** ", dependencies_text, "\n",
+        "- **Migration Suggestions:** ", str(file_info.get('migration_suggestions', 'No migration instructions provided.')), "\n\n",
+    ]
+    # The source is referenced, not copied, until the final join
+    source_parts = (source_content,) if isinstance(source_content, str) else source_content
+    if any(source_parts):
+        parts.append("### **Source Content:**\n```\n")
+        for index, source_part in enumerate(source_parts):
+            if index:
+                parts.append("\n\n")
+            parts.append(source_part)
+        parts.append("\n```")
+    else:
+        parts.append("No source content available.")
+    parts.extend((
+        _GUIDELINES, file_type,
+        _NOTES, str(flattend_migration_data),
+        _CLOSING, f"\nAdditional instructions: {instructions}" if instructions else "",
+    ))
+    return "".join(parts)